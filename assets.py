@@ -0,0 +1,78 @@
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+import pygame
+from pygame import Surface, Mask
+
+import settings as config
+
+
+def convert(image:Surface, alpha:bool) -> Surface:
+	""" Converts image to the display pixel format when a display surface exists.
+	(The SDL2 texture backend has no display surface: textures handle any format.)
+	"""
+	if not pygame.display.get_surface():
+		return image
+	return image.convert_alpha() if alpha else image.convert()
+
+
+@lru_cache(maxsize=None)
+def load_image(path:str, size:tuple=None, alpha:bool=True) -> Surface:
+	""" Loads (and scales) an image once, later calls share the same Surface.
+	Returned surfaces must not be modified.
+	:param path str: the image file path.
+	:param size tuple: optional (width, height) to scale the image to.
+	:param alpha bool: keep per-pixel transparency.
+	"""
+	image = convert(pygame.image.load(path), alpha)
+	if size:
+		image = pygame.transform.scale(image, size)
+	return image
+
+
+@lru_cache(maxsize=None)
+def solid(size:tuple, color:tuple) -> Surface:
+	""" Returns a shared surface of given size filled with color.
+	Returned surfaces must not be modified.
+	"""
+	image = Surface(size)
+	image.fill(color)
+	return convert(image, False)
+
+
+# collision masks and their bounding rects, dropped with their image
+_masks = WeakKeyDictionary()
+_bounds = WeakKeyDictionary()
+
+def get_mask(image:Surface) -> Mask:
+	""" Returns the collision mask (opaque pixels) of image, computed once.
+	The image must not be modified afterwards (like the shared images above).
+	"""
+	mask = _masks.get(image)
+	if mask is None:
+		mask = pygame.mask.from_surface(image)
+		_masks[image] = mask
+	return mask
+
+
+def get_bounds(image:Surface) -> pygame.Rect:
+	""" Returns the bounding rect of the opaque pixels of image (same threshold as its mask), computed once.
+	The returned rect must not be modified.
+	"""
+	bounds = _bounds.get(image)
+	if bounds is None:
+		bounds = image.get_bounding_rect(min_alpha=128)
+		_bounds[image] = bounds
+	return bounds
+
+
+def level_images() -> tuple:
+	" The images drawn every frame: background, penguin, platforms, enemy, bonus."
+	return (
+		load_image("./images/background.png", config.DISPLAY, alpha=False),
+		load_image("./images/penguin-right.png", (60, 60)),
+		load_image("./images/penguin-left.png", (60, 60)),
+		load_image("./images/platform.png", (120, 30)),
+		load_image("./images/ice_break.png", (120, 30)),
+		load_image("./images/walrus.png", (60, 40)),
+		load_image("./images/fish.png", (50, 30)),
+	)
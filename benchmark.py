@@ -0,0 +1,71 @@
+"""
+Game loop benchmark: python benchmark.py [frames]
+
+Runs the game without frame cap, first with the sequential loop then
+with the pipelined one (see pipeline.py), and prints frames per second.
+Uses the simulated gyro so the penguin moves without a player.
+Also prints the average active/sleeping enemy counts per update.
+"""
+import sys
+import random
+from collections import Counter
+from time import perf_counter
+
+import settings as config
+config.FPS = 0 # no frame cap
+config.SIMULATED_GYRO = True
+
+from main import Game
+from enemy import Enemy
+from pipeline import Pipeline
+
+
+activity = Counter()# summed Enemy.activity() and number of updates
+
+
+def keep_playing(game:Game) -> None:
+	" Restarts instead of showing the game over screen, sums the enemy activity."
+	update = game._update_loop
+	def update_loop():
+		update()
+		activity.update(Enemy.activity(), updates=1)
+		if game.player.dead:
+			game.reset()
+	game._update_loop = update_loop
+
+
+def average_activity() -> str:
+	" Average enemy counts per update since the last call."
+	updates = activity.pop("updates", 0) or 1
+	text = " ".join(f"{name}={nb/updates:.2f}" for name, nb in activity.items())
+	activity.clear()
+	return text
+
+
+def sequential(game:Game, frames:int) -> float:
+	start = perf_counter()
+	for _ in range(frames):
+		game._event_loop()
+		game._update_frame()
+		game._render_loop(game.camera)
+	return frames/(perf_counter()-start)
+
+
+def pipelined(game:Game, frames:int) -> float:
+	start = perf_counter()
+	Pipeline(game).run(frames)
+	return frames/(perf_counter()-start)
+
+
+if __name__ == "__main__":
+	frames = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+	game = Game()
+	keep_playing(game)
+
+	random.seed(0)
+	game.reset()
+	print(f"sequential: {sequential(game, frames):.1f} FPS  enemies: {average_activity()}")
+
+	random.seed(0)
+	game.reset()
+	print(f"pipelined:  {pipelined(game, frames):.1f} FPS  enemies: {average_activity()}")
@@ -3,6 +3,8 @@ from sprite import Sprite
 import settings as config
 from math import copysign
 from camera import Camera
+from assets import solid
+from collision import rect_mask_collide
 
 # Return the sign of a number: getsign(-5) -> -1
 getsign = lambda x: copysign(1, x)
@@ -23,8 +25,7 @@ class Bullet(Sprite):
         super().__init__(x, y, Bullet.WIDTH, Bullet.HEIGHT, color)
         self.speed = speed
         self.is_player_bullet = is_player_bullet
-        self._image = pygame.Surface((Bullet.WIDTH, Bullet.HEIGHT))
-        self._image.fill(color)
+        self._image = solid((Bullet.WIDTH, Bullet.HEIGHT), color)
 
     def update(self, camera: Camera):
         # Move bullet upwards or downwards based on its type
@@ -34,6 +35,19 @@ class Bullet(Sprite):
         if self.rect.bottom < camera.state.top or self.rect.top > camera.state.bottom:
             self.kill()
 
+    def hits(self, target: Sprite, target_dy: int = 0) -> bool:
+        """
+        Check if the bullet hit target's drawn image during its last move.
+        The whole path of the move relative to target (a vertical strip) is
+        tested, so neither a fast bullet nor a fast target can skip the other:
+        rect test first, pixel test on rect hits.
+        :param target_dy int: how far target moved vertically during the same frame.
+        """
+        dy = -self.speed if self.is_player_bullet else self.speed
+        # start position seen from target's current position
+        start = self.rect.move(0, target_dy - dy)
+        return rect_mask_collide(self.rect.union(start), target)
+
     def set_position(self, penguin_x: int, penguin_y: int):
         """
         Set the bullet's position to match the penguin's current position.
@@ -24,6 +24,15 @@ class Camera(Singleton):
 		self.state.y = 0
 		self.maxheight = self.center
 	
+	def active_region(self, margin:int=None) -> Rect:
+		""" Returns the simulated part of the level: the view and margin pixels above and below.
+		Enemies outside of it sleep (see Enemy.update()).
+		:param margin int: defaults to config.ACTIVE_MARGIN.
+		"""
+		if margin is None:
+			margin = config.ACTIVE_MARGIN
+		return self.state.inflate(0, 2*margin)
+
 	def apply_rect(self,rect:Rect) -> Rect:
 		""" Transforms given rect relative to camera position.
 		:param rect pygame.Rect: the rect to transform
@@ -0,0 +1,97 @@
+from math import inf
+from pygame import Rect, Mask
+
+from assets import get_mask, get_bounds
+
+
+def _axis(start:float, end:float, target_start:float, target_end:float, delta:float) -> tuple:
+	" Entry and exit times of a segment moving by delta along one axis."
+	if delta > 0:
+		return (target_start-end)/delta, (target_end-start)/delta
+	if delta < 0:
+		return (target_end-start)/delta, (target_start-end)/delta
+	if end <= target_start or start >= target_end:
+		return inf, -inf# never overlapping on this axis
+	return -inf, inf
+
+
+def sweep(rect:Rect, dx:float, dy:float, target:Rect) -> float:
+	""" Swept AABB test: rect moving by (dx, dy) against a static target.
+	:return float: time of first contact in [0,1] (0 if overlapping at start), None if none.
+	"""
+	x_entry, x_exit = _axis(rect.left, rect.right, target.left, target.right, dx)
+	y_entry, y_exit = _axis(rect.top, rect.bottom, target.top, target.bottom, dy)
+	entry = max(x_entry, y_entry)
+	exit = min(x_exit, y_exit)
+	if entry >= exit or entry > 1 or exit <= 0:
+		return None
+	return max(entry, 0)
+
+
+def swept_collide(start:Rect, end:Rect, target:Rect) -> float:
+	""" Collision of a rect that moved from start to end in a straight line.
+	A rect overlapping target at start only collides if it still does at end
+	(so leaving an obstacle is not a contact), merely touching it at start does.
+	:return float: time of first contact in [0,1], None if none.
+	"""
+	if start.colliderect(target) and not end.colliderect(target):
+		return None
+	return sweep(start, end.x-start.x, end.y-start.y, target)
+
+
+def art_rect(sprite) -> Rect:
+	" The rect of sprite's drawn image (drawn from its rect's top left)."
+	return Rect(sprite.rect.topleft, sprite.image.get_size())
+
+
+def opaque_rect(sprite) -> Rect:
+	" The bounding rect of the opaque pixels of sprite's drawn image."
+	return get_bounds(sprite.image).move(sprite.rect.topleft)
+
+
+def mask_collide(a, b) -> bool:
+	""" Pixel-accurate collision of the drawn images of sprites a and b.
+	Rect test first, the mask overlap only runs on rect hits.
+	"""
+	a_rect, b_rect = art_rect(a), art_rect(b)
+	if not a_rect.colliderect(b_rect):
+		return False
+	offset = (b_rect.x-a_rect.x, b_rect.y-a_rect.y)
+	return get_mask(a.image).overlap(get_mask(b.image), offset) is not None
+
+
+def rect_mask_collide(rect:Rect, sprite) -> bool:
+	""" Does the solid rect touch an opaque pixel of sprite's drawn image ?
+	Rect test first, the mask overlap only runs on rect hits.
+	"""
+	target = art_rect(sprite)
+	if not rect.colliderect(target):
+		return False
+	offset = (rect.x-target.x, rect.y-target.y)
+	return get_mask(sprite.image).overlap(Mask(rect.size, fill=True), offset) is not None
+
+
+def swept_mask(mask:Mask, dy:int) -> Mask:
+	""" The pixels covered by mask moving dy pixels down (every position of the move).
+	Built by doubling: about log2(dy) mask draws.
+	"""
+	w, h = mask.get_size()
+	swept = Mask((w, h+dy))
+	swept.draw(mask, (0, 0))
+	covered = 1# swept holds the positions [0, covered)
+	while covered <= dy:
+		shift = min(covered, dy+1-covered)
+		swept.draw(swept.copy(), (0, shift))
+		covered += shift
+	return swept
+
+
+def swept_mask_collide(sprite, dy:int, target) -> bool:
+	""" Pixel-accurate collision of sprite's drawn image with target's along a vertical move
+	of dy pixels down, ending at sprite's current position (so it can't skip target).
+	The caller does the rect test first.
+	"""
+	start = art_rect(sprite).move(0, -dy)
+	target_rect = art_rect(target)
+	offset = (target_rect.x-start.x, target_rect.y-start.y)
+	return swept_mask(get_mask(sprite.image), dy).overlap(get_mask(target.image), offset) is not None
@@ -2,9 +2,13 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 from sprite import Sprite
 import settings as config
+import log
 import pygame
 from bullet import Bullet
 from camera import Camera
+from assets import load_image
+from scheduler import Scheduler
+from collision import art_rect
 
 if TYPE_CHECKING:
     from player import Player
@@ -23,10 +27,11 @@ class Enemy(Sprite):
     def __init__(self, parent: Sprite, color=config.GRAY):
         self.parent = parent
         super().__init__(*self._get_initial_pos(), Enemy.WIDTH, Enemy.HEIGHT, color)
-        self._image = pygame.image.load("./images/walrus.png").convert_alpha()
-        self._image = pygame.transform.scale(self._image, (60, 40))
-        self.last_shot_time = pygame.time.get_ticks()  # Time since last shot
+        self._image = load_image("./images/walrus.png", (60, 40))
         self.bullets = pygame.sprite.Group()  # Group to store enemy bullets
+        # Shoot periodically on the game clock
+        self.shoot_timer = Scheduler.instance.call_every(Enemy.SHOOT_INTERVAL, self.shoot)
+        self.asleep = False  # out of the camera's active region: no timer, no bullets, no collision
 
         Enemy.instances.append(self)
 
@@ -46,33 +51,55 @@ class Enemy(Sprite):
         """Check for collisions with player bullets."""
         from player import Player
         for bullet in Player.instance.bullets:
-            if self.rect.colliderect(bullet.rect):
+            if bullet.hits(self):
                 self.handle_bullet_collision(bullet)
 
     def shoot(self):
-        """Make the enemy shoot a bullet downward."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_shot_time >= Enemy.SHOOT_INTERVAL:
-            bullet = Bullet(self.rect.centerx, self.rect.bottom, speed=-config.BULLET_SPEED)
-            self.bullets.add(bullet)
-            self.last_shot_time = current_time
+        """Make the enemy shoot a bullet downward (called by shoot_timer)."""
+        bullet = Bullet(self.rect.centerx, self.rect.bottom, speed=-config.BULLET_SPEED)
+        self.bullets.add(bullet)
 
     def update(self, camera: Camera):
-        """Update the enemy position and shoot bullets periodically."""
+        """Update the enemy position and its bullets, sleep while out of the active region."""
         if self in Enemy.instances:
             if self.parent.slideable:
                 self.rect.x = self.parent.rect.centerx - Enemy.WIDTH // 2
                 self.rect.y = self.parent.rect.y - Enemy.HEIGHT - 15
             else:
                 self._get_initial_pos()
-            self.shoot()  # Call the shoot method to create bullets
+            if not camera.active_region().colliderect(art_rect(self)):
+                self.sleep()
+                return
+            self.wake()
             self.bullets.update(camera)  # Update bullets
             self.check_player_bullet_collision()
 
+    def sleep(self):
+        """Stop shooting and drop the bullets (out of the active region)."""
+        if not self.asleep:
+            self.asleep = True
+            self.shoot_timer.cancel()
+            self.bullets.empty()
+
+    def wake(self):
+        """Start shooting again (back in the active region)."""
+        if self.asleep:
+            self.asleep = False
+            self.shoot_timer = Scheduler.instance.call_every(Enemy.SHOOT_INTERVAL, self.shoot)
+
+    @staticmethod
+    def activity() -> dict:
+        """Count active and sleeping enemies, and the bullets in flight."""
+        sleeping = sum(enemy.asleep for enemy in Enemy.instances)
+        return {
+            "active": len(Enemy.instances) - sleeping,
+            "sleeping": sleeping,
+            "bullets": sum(len(enemy.bullets) for enemy in Enemy.instances),
+        }
+
     def draw(self, surface: pygame.Surface, camera: Camera) -> None:
         """Draw the enemy and its bullets on the surface."""
         if self in Enemy.instances:
-            self.update(camera)
             super().draw(surface)
             # Draw bullets
             for bullet in self.bullets:
@@ -81,13 +108,14 @@ class Enemy(Sprite):
     def kill(self):
         """Remove the enemy from the game."""
         super().kill()
+        self.shoot_timer.cancel()
         if self in Enemy.instances:
-            print("killed by player")
+            log.debug("enemy.killed", "killed by player", enemies=len(Enemy.instances) - 1)
             Enemy.instances.remove(self)
             self.bullets.empty()  # Remove all bullets
 
     def reset(self):
         self.bullets.empty()
-        self.last_shot_time = pygame.time.get_ticks()
+        self.shoot_timer.cancel()
         if self in Enemy.instances:
             Enemy.instances.remove(self)
\ No newline at end of file
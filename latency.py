@@ -0,0 +1,161 @@
+from time import perf_counter, sleep
+import threading
+
+import settings as config
+
+# Histogram buckets upper bounds (ms), last bucket is everything above
+BUCKETS = (1, 2, 4, 8, 17, 33, 50, 67, 100, 150, 250, 500)
+
+
+class Histogram:
+	" A class to represent a latency histogram (ms)."
+	def __init__(self):
+		self.counts = [0]*(len(BUCKETS)+1)
+		self.count = 0
+		self.total = 0
+		self.max = 0
+
+	def add(self, ms:float) -> None:
+		i = 0
+		while i < len(BUCKETS) and ms > BUCKETS[i]:
+			i += 1
+		self.counts[i] += 1
+		self.count += 1
+		self.total += ms
+		self.max = max(self.max, ms)
+
+	def __str__(self) -> str:
+		if not self.count:
+			return "    (no samples)"
+		lines = [f"    n={self.count} mean={self.total/self.count:.1f}ms max={self.max:.1f}ms"]
+		low = 0
+		for high, nb in zip(BUCKETS+(None,), self.counts):
+			if nb:
+				label = f"{low}-{high}ms" if high else f">{low}ms"
+				lines.append(f"    {label:>10} {nb:6} {'#'*max(1, 40*nb//self.count)}")
+			low = high
+		return "\n".join(lines)
+
+
+class LatencyTracker:
+	"""
+	A class to represent the input-to-photon latency instrumentation.
+
+	Every input edge (new tilt direction, key change, button press) is
+	timestamped when acquired, then followed to the first update where it
+	changes the Player state (applied) and to the frame presenting it.
+	Histograms are kept per input source and per stage:
+	read (sensor read duration), apply (acquired -> state change),
+	present (state change -> frame presented) and total.
+	The display update and clock.tick durations are kept per frame.
+	"""
+	STAGES = ("read", "apply", "present", "total")
+
+	def __init__(self):
+		self.sources = {}# source -> {stage: Histogram}
+		self.display = Histogram()# display update duration
+		self.tick = Histogram()# clock.tick wait
+		self.__last = {}# source -> last sampled value
+		self.__pending = {}# source -> acquire time of an edge not applied yet
+		self.__applied = []# (source, acquired, applied) waiting for presentation
+		self.__lock = threading.Lock()# pipelined loop: applied on the simulation thread, presented on the main one
+
+	def __histograms(self, source:str) -> dict:
+		with self.__lock:
+			if source not in self.sources:
+				self.sources[source] = {stage: Histogram() for stage in LatencyTracker.STAGES}
+			return self.sources[source]
+
+	def sample(self, source:str, value, started:float=None) -> None:
+		""" Records an input sample, following it if it is an edge.
+		:param source str: the input source (gyro, keyboard...).
+		:param value: the input value, an edge is a change of value.
+		:param started float: perf_counter() before the read, to record its duration.
+		"""
+		acquired = perf_counter()
+		if started is not None:
+			self.__histograms(source)["read"].add((acquired-started)*1000)
+		if self.__last.get(source, value) != value:
+			self.__pending[source] = acquired
+		self.__last[source] = value
+
+	def edge(self, source:str) -> None:
+		" Records an input edge (button press) acquired now."
+		self.__pending[source] = perf_counter()
+
+	def drop(self, source:str) -> None:
+		" Forgets the pending edge of source (button released before it had an effect)."
+		self.__pending.pop(source, None)
+
+	def pending(self, source:str) -> bool:
+		" Is an edge of source waiting to change the Player state ?"
+		return source in self.__pending
+
+	def applied(self, source:str) -> None:
+		" Called when the pending edge of source changed the Player state."
+		acquired = self.__pending.pop(source, None)
+		if acquired is not None:
+			with self.__lock:
+				self.__applied.append((source, acquired, perf_counter()))
+
+	def take_applied(self) -> list:
+		" Returns and forgets the edges applied since the last call (their frame is being drawn)."
+		with self.__lock:
+			applied, self.__applied = self.__applied, []
+		return applied
+
+	def presented(self, applied:list=None) -> None:
+		""" Called right after the frame is presented.
+		:param applied list: the edges applied in this frame (take_applied()), defaults to all pending ones.
+		"""
+		now = perf_counter()
+		if applied is None:
+			applied = self.take_applied()
+		for source, acquired, applied_at in applied:
+			histograms = self.__histograms(source)
+			histograms["apply"].add((applied_at-acquired)*1000)
+			histograms["present"].add((now-applied_at)*1000)
+			histograms["total"].add((now-acquired)*1000)
+
+	def report(self) -> str:
+		lines = ["Input latency report"]
+		for source, histograms in self.sources.items():
+			for stage in LatencyTracker.STAGES:
+				lines.append(f"  {source} {stage}:")
+				lines.append(str(histograms[stage]))
+		lines += ["  display update:", str(self.display), "  clock.tick:", str(self.tick)]
+		return "\n".join(lines)
+
+
+class SimulatedGyro:
+	"""
+	A class to represent a simulated MPU6050 (latency test mode).
+
+	Tilts left, back to neutral, right and neutral again, period seconds each,
+	each read taking read_delay seconds like an I2C transfer.
+	Implements the mpu6050 methods used by Player.
+	"""
+	GYRO_RANGE_250DEG = 0x00
+	ACCEL_RANGE_2G = 0x00
+
+	def __init__(self, period:float=config.SIMULATED_GYRO_PERIOD,
+			read_delay:float=config.SIMULATED_GYRO_READ_DELAY, tilt:float=50):
+		self.period = period
+		self.read_delay = read_delay
+		self.tilt = tilt
+		self.__start = perf_counter()
+
+	def get_temp(self) -> float:
+		return 25.0
+
+	def set_gyro_range(self, gyro_range:int) -> None:
+		pass
+
+	def set_accel_range(self, accel_range:int) -> None:
+		pass
+
+	def get_gyro_data(self) -> dict:
+		sleep(self.read_delay)
+		phase = int((perf_counter()-self.__start)/self.period) % 4
+		y = (self.tilt, 0, -self.tilt, 0)[phase]
+		return {'x': 0.0, 'y': y, 'z': 0.0}
@@ -8,6 +8,7 @@ import settings as config
 from random import choice
 from enemy import Enemy
 from camera import Camera
+from assets import load_image
 
 #return True with a chance of: P(X=True)=1/x
 chance = lambda x: not randint(0,x)
@@ -26,8 +27,7 @@ class Bonus(Sprite):
 		self.parent = parent
 		super().__init__(*self._get_inital_pos(), Bonus.WIDTH, Bonus.HEIGHT, color)
 		self.force = force
-		self._image = pygame.image.load("./images/fish.png").convert_alpha()
-		self._image = pygame.transform.scale(self._image, (50, 30))
+		self._image = load_image("./images/fish.png", (50, 30))
 
 	def _get_inital_pos(self):
 		x = self.parent.rect.centerx - Bonus.WIDTH//2
@@ -48,7 +48,6 @@ class Bonus(Sprite):
 		"""
 		Draw the bonus on the surface.
 		"""
-		self.update()
 		super().draw(surface)
 
 
@@ -79,8 +78,10 @@ class Platform(Sprite):
 
 		self.speed = config.PLATFORM_SPEED if self.slideable else 0
 		self.direction = choice([-1,1]) if self.slideable else 0
-		self._image = pygame.image.load("./images/platform.png").convert_alpha()
-		self._image = pygame.transform.scale(self._image, (120, 30))
+		if self.breakable:
+			self._image = load_image("./images/ice_break.png", (120, 30))
+		else:
+			self._image = load_image("./images/platform.png", (120, 30))
 
 	# Public getter for __bonus so it remains private
 	@property
@@ -119,24 +120,31 @@ class Platform(Sprite):
 		if self.breakable:
 			self.__level.remove_platform(self)
 
+	def update(self, camera: Camera) -> None:
+		""" Called each frame by Level.update().
+		Slides the platform and updates its bonus and enemy.
+		:param camera Camera: the camera, to remove the platform once out of screen.
+		"""
+		self.slide()
+		if self.__bonus:
+			self.__bonus.update()
+		if self.__enemy:
+			self.__enemy.update(camera)
+		# check if out of screen: should be deleted
+		if camera.apply(self).y+self.rect.height>config.YWIN:
+			self.__level.remove_platform(self)
+
 	# ( Overriding inheritance: Sprite.draw() )
 	def draw(self, surface:Surface, camera: Camera) -> None:
 		""" Like Sprite.draw().
-		Also draws the platform's bonus if it has one.
+		Also draws the platform's bonus and enemy if it has one.
 		:param surface pygame.Surface: the surface to draw on.
 		"""
-		# check if out of screen: should be deleted
-		self.slide()
 		super().draw(surface)
 		if self.__bonus:
 			self.__bonus.draw(surface)
 		if self.__enemy:
 			self.__enemy.draw(surface, camera)
-		if self.camera_rect.y+self.rect.height>config.YWIN:
-			self.__level.remove_platform(self)
-		if self.breakable:
-			self._image = pygame.image.load("./images/ice_break.png").convert_alpha()
-			self._image = pygame.transform.scale(self._image, (120, 30))
 
 	def slide(self):
 		if self.slideable:
@@ -165,6 +173,7 @@ class Level(Singleton):
 		self.breakable_platform_chance = config.BREAKABLE_PLATFORM_CHANCE
 		self.slideable_platform_chance = config.SLIDEABLE_PLATFORM_CHANCE
 		self.enemy_spawn_chance = config.ENEMY_SPAWN_CHANCE
+		self.max_enemies = config.MAX_ENEMIES
 
 		self.__platforms = []
 		self.__to_remove = []
@@ -180,6 +189,23 @@ class Level(Singleton):
 	def platforms(self) -> list:
 		return self.__platforms
 
+	@property
+	def base_platform(self) -> Platform:
+		return self.__base_platform
+
+	@property
+	def pending_removal(self) -> list:
+		" Platforms removed at next update."
+		return self.__to_remove
+
+	def restore(self, platforms:list, pending_removal:list) -> None:
+		""" Replaces all platforms (snapshot restore).
+		:param platforms list: the new platforms, from bottom to top.
+		:param pending_removal list: platforms to remove at next update.
+		"""
+		self.__platforms = platforms
+		self.__to_remove = pending_removal
+
 
 	async def _generation(self) -> None:
 		" Asynchronous management of platforms generation."
@@ -203,7 +229,8 @@ class Level(Singleton):
 				initial_bonus=chance(self.bonus_platform_chance),# HAS A Bonus
 				breakable=chance(self.breakable_platform_chance),#  IS BREAKABLE
 				slideable=chance(self.slideable_platform_chance),# IS SLIDEABLE
-				has_enemy=chance(self.enemy_spawn_chance) # HAS AN ENEMY
+				has_enemy=chance(self.enemy_spawn_chance) \
+					and len(Enemy.instances) < self.max_enemies # HAS AN ENEMY
 				))
 				
 		else:
@@ -226,13 +253,17 @@ class Level(Singleton):
 		" Called only when game restarts (after player death)."
 		self.__platforms = [self.__base_platform]
 
-	def update(self) -> None:
-		"""Called each frame in main game loop for generation."""
+	def update(self, camera: Camera) -> None:
+		"""Called each frame in main game loop for generation and platforms update."""
 		for platform in self.__to_remove:
 			if platform in self.__platforms:
 				self.__platforms.remove(platform)
+				if platform.enemy:# stop its timer, drop its bullets
+					platform.enemy.reset()
 		self.__to_remove = []
 		asyncio.run(self._generation())
+		for platform in self.__platforms:
+			platform.update(camera)
 
 
 	def draw(self,surface:Surface, camera: Camera) -> None:
@@ -0,0 +1,133 @@
+"""
+Structured, rate-limited, asynchronous logging.
+
+Usage: log.warning("gyro.read_failed", "Could not read gyro data", error=e)
+Every record has a message key: at most LOG_RATE_BURST records per key
+are written every LOG_RATE_PERIOD seconds, the others are only counted.
+Records are queued and formatted/written by a background thread:
+logging never does I/O on the game thread.
+"""
+import atexit
+import logging
+import sys
+import time
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue, Full
+
+import settings as config
+
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+
+
+class RateLimitFilter(logging.Filter):
+	"""
+	A class to represent the per message key rate limit.
+
+	Lets burst records of a key through per period (seconds).
+	The number of records suppressed since the last one written is
+	attached to the next record written for that key.
+	"""
+	def __init__(self, period:float=config.LOG_RATE_PERIOD, burst:int=config.LOG_RATE_BURST):
+		super().__init__()
+		self.period = period
+		self.burst = burst
+		self.written = Counter()# key -> records written
+		self.suppressed = Counter()# key -> records suppressed
+		self.__windows = {}# key -> (window start, records written in window, suppressed since last written)
+
+	def filter(self, record:logging.LogRecord) -> bool:
+		key = record.key
+		now = time.monotonic()
+		start, count, suppressed = self.__windows.get(key, (now, 0, 0))
+		if now-start >= self.period:
+			start, count = now, 0
+		if count >= self.burst:
+			self.__windows[key] = (start, count, suppressed+1)
+			self.suppressed[key] += 1
+			return False
+		self.__windows[key] = (start, count+1, 0)
+		self.written[key] += 1
+		record.suppressed = suppressed
+		return True
+
+
+class StructuredFormatter(logging.Formatter):
+	" Formats records as: time level key message field=value ... "
+	def format(self, record:logging.LogRecord) -> str:
+		parts = [self.formatTime(record, "%H:%M:%S"), record.levelname, record.key, record.getMessage()]
+		parts.extend(f"{name}={value!r}" for name, value in record.fields.items())
+		if record.suppressed:
+			parts.append(f"suppressed={record.suppressed}")
+		line = " ".join(parts)
+		if record.exc_info:
+			line += "\n"+self.formatException(record.exc_info)
+		return line
+
+
+class _QueueHandler(QueueHandler):
+	" Queues records as they are (formatted by the writer thread), drops them when the queue is full."
+	def __init__(self, queue:Queue):
+		super().__init__(queue)
+		self.dropped = 0
+
+	def prepare(self, record:logging.LogRecord) -> logging.LogRecord:
+		return record
+
+	def enqueue(self, record:logging.LogRecord) -> None:
+		try:
+			self.queue.put_nowait(record)
+		except Full:
+			self.dropped += 1
+
+
+_logger = logging.getLogger("penguinjump")
+_logger.setLevel(config.LOG_LEVEL)
+_logger.propagate = False
+rate_limit = RateLimitFilter()
+_handler = _QueueHandler(Queue(config.LOG_QUEUE_SIZE))
+_handler.addFilter(rate_limit)
+_logger.addHandler(_handler)
+
+_writer = logging.StreamHandler(sys.stdout)
+_writer.setFormatter(StructuredFormatter())
+_listener = QueueListener(_handler.queue, _writer)
+_listener.start()
+
+
+def log(level:int, key:str, message:str, **fields) -> None:
+	""" Logs a structured record.
+	:param level int: DEBUG, INFO, WARNING or ERROR.
+	:param key str: the message key (rate limit and counters), e.g. "gyro.read_failed".
+	:param message str: human readable message.
+	:param fields: values written as name=value.
+	"""
+	if _logger.isEnabledFor(level):
+		_logger.log(level, message, extra={"key": key, "fields": fields})
+
+def debug(key:str, message:str, **fields) -> None:
+	log(DEBUG, key, message, **fields)
+
+def info(key:str, message:str, **fields) -> None:
+	log(INFO, key, message, **fields)
+
+def warning(key:str, message:str, **fields) -> None:
+	log(WARNING, key, message, **fields)
+
+def error(key:str, message:str, **fields) -> None:
+	log(ERROR, key, message, **fields)
+
+
+def counters() -> dict:
+	" Returns {key: (written, suppressed)} since start."
+	keys = rate_limit.written.keys() | rate_limit.suppressed.keys()
+	return {key: (rate_limit.written[key], rate_limit.suppressed[key]) for key in keys}
+
+
+@atexit.register
+def shutdown() -> None:
+	" Writes the suppressed counts and flushes the queue (called at exit)."
+	suppressed = {key: nb for key, nb in rate_limit.suppressed.items() if nb}
+	if suppressed or _handler.dropped:
+		info("log.summary", "Log summary", suppressed=suppressed, dropped=_handler.dropped)
+	_listener.stop()
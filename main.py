@@ -1,10 +1,20 @@
-import pygame, sys
+import pygame, sys, os
+from time import perf_counter
 from singleton import Singleton
 from camera import Camera
-from player import Player
+from player import Player, BUTTON_EVENT
 from level import Level
 import settings as config
 from enemy import Enemy
+from scheduler import Scheduler
+from assets import load_image, level_images
+from render import create_renderer
+import spectator
+from latency import LatencyTracker
+from pipeline import Pipeline
+import snapshot
+import profiles
+import log
 
 class Game(Singleton):
 	"""
@@ -21,13 +31,15 @@ class Game(Singleton):
 		# ============= Initialisation =============
 		self.__alive = True
 		# Window / Render
-		self.window = pygame.display.set_mode(config.DISPLAY,config.FLAGS)
+		self.window = create_renderer()
 		self.clock = pygame.time.Clock()
+		# several updates per frame when rendering slower than the game speed
+		self.updates_per_frame = max(1, round(config.UPDATE_RATE/config.FPS)) if config.FPS else 1
 
-		self.background = pygame.image.load("./images/background.png").convert()
-		self.background = pygame.transform.scale(self.background, config.DISPLAY)
+		self.background = load_image("./images/background.png", config.DISPLAY, alpha=False)
 
 		# Instances
+		self.scheduler = Scheduler()
 		self.camera = Camera()
 		self.lvl = Level()
 		self.player = Player(
@@ -39,6 +51,18 @@ class Game(Singleton):
 
 		self.bullets = pygame.sprite.Group()
 
+		self.latency = None
+		if config.LATENCY_TRACKING:
+			self.latency = LatencyTracker()
+			self.player.latency = self.latency
+
+		self.spectator = None
+		if config.SPECTATOR_ENABLED:
+			self.spectator = spectator.SpectatorServer()
+			self.spectator.start()
+
+		# upload/prepare the level images once before the first frame
+		self.window.preload(*level_images())
 
 		# User Interface
 		self.score = 0
@@ -52,73 +76,191 @@ class Game(Singleton):
 		# Center the game over text and place the restart text slightly below
 		self.gameover_rect = self.gameover_txt.get_rect(center=(config.HALF_XWIN, config.HALF_YWIN - 30))
 		self.restart_rect = self.restart_txt.get_rect(center=(config.HALF_XWIN, config.HALF_YWIN + 30))
+
+		# Active / sleeping enemy counters (see Camera.active_region())
+		self.scheduler.call_every(config.ACTIVITY_LOG_INTERVAL, self._log_activity)
+
+		# Resume where the game was (power loss), then keep saving
+		self.snapshot_writer = None
+		if config.SNAPSHOT_FILE:
+			if os.path.exists(config.SNAPSHOT_FILE):
+				try:
+					with open(config.SNAPSHOT_FILE, "rb") as file:
+						self.restore(file.read())
+				except Exception as e:
+					log.warning("snapshot.resume_failed", "Could not resume", path=config.SNAPSHOT_FILE, error=str(e))
+			self.snapshot_writer = snapshot.SnapshotWriter(config.SNAPSHOT_FILE)
+			self.scheduler.call_every(config.SNAPSHOT_INTERVAL, self._autosave)
 				
 				
+	@property
+	def alive(self) -> bool:
+		return self.__alive
+
 	def close(self):
 		self.__alive = False
 
 
+	def save(self) -> bytes:
+		" Returns a snapshot of the complete game state."
+		return snapshot.save(self)
+
+	def restore(self, data: bytes):
+		""" Restores a snapshot returned by Game.save().
+		:param data bytes: the snapshot.
+		"""
+		snapshot.restore(self, data)
+		self._update_score()
+
+	def _autosave(self):
+		""" Called periodically (game time) when SNAPSHOT_FILE is set.
+		Packs the state here, the file is written by the snapshot writer thread.
+		"""
+		if not self.player.dead:
+			self.snapshot_writer.write(self.save())
+
+	def _log_activity(self):
+		" Called periodically (game time): logs the active and sleeping enemy counts."
+		log.debug("enemy.activity", "Enemy activity", **Enemy.activity())
+
 	def reset(self):
 		self.camera.reset()
 		self.lvl.reset()
 		self.player.reset()
 
-		# Reset the enemies and their bullets
-		for enemy in Enemy.instances:
+		# Reset the enemies and their bullets (reset() removes them from instances)
+		for enemy in list(Enemy.instances):
 			enemy.reset()
 
+	def _handle_event(self, event: pygame.event.Event):
+		if event.type == pygame.QUIT:
+			self.close()
+		elif event.type == pygame.KEYDOWN:
+			if event.key == pygame.K_ESCAPE:
+				self.close()
+			if event.key == pygame.K_SPACE and self.player.dead:
+				self.reset()
+		elif event.type == BUTTON_EVENT and self.player.dead:
+			self.reset()
+		self.player.handle_event(event)
+
 	def _event_loop(self):
 		# ---------- User Events ----------
 		for event in pygame.event.get():
-			if event.type == pygame.QUIT:
-				self.close()
-			elif event.type == pygame.KEYDOWN:
-				if event.key == pygame.K_ESCAPE:
-					self.close()
-				if event.key == pygame.K_SPACE and self.player.dead:
+			self._handle_event(event)
+
+	def _idle_loop(self):
+		""" Game over screen (power saving).
+		The simulation is frozen: presents the last frame once,
+		then sleeps until an event (SPACE or GPIO button restarts).
+		"""
+		self._render_loop(self.camera)
+		button_down = self.player.gpio_pressed()
+		while self.__alive and self.player.dead:
+			event = pygame.event.wait(config.IDLE_TIMEOUT)
+			if event.type == pygame.NOEVENT:
+				# timed out: poll the button in case GPIO edge events are unavailable
+				if self.player.gpio_pressed() and not button_down:
 					self.reset()
-			self.player.handle_event(event)
+				button_down = self.player.gpio_pressed()
+				continue
+			self._handle_event(event)
 
 
 	def _update_loop(self):
 		# ----------- Update -----------
+		self.scheduler.tick()
 		self.player.update(self.camera)
-		self.lvl.update()
+		self.lvl.update(self.camera)
 
 		if not self.player.dead:
 			self.camera.update(self.player.rect)
-			#calculate score and update UI txt
-			self.score=-self.camera.state.y//50
+			self._update_score()
+
+		if self.spectator:
+			self.spectator.publish(spectator.capture(
+				self.player, self.camera, self.lvl, Enemy.instances))
+	
+
+	def _update_frame(self):
+		" Game updates for one rendered frame (UPDATE_RATE/FPS of them)."
+		for _ in range(self.updates_per_frame):
+			self._update_loop()
+			if self.player.dead:
+				break
+
+	def _update_score(self):
+		#calculate score and update UI txt
+		score = -self.camera.state.y//50
+		if score != self.score:# re-render only on change
+			self.score = score
 			self.score_txt = config.SMALL_FONT.render(
 				str(self.score)+" m", 1, config.GRAY)
-	
 
-	def _render_loop(self, camera: Camera):
-		# ----------- Display -----------
-		#self.window.fill(config.WHITE)
-		self.window.blit(self.background, (0,0))
-		self.lvl.draw(self.window, camera)
-		self.player.draw(self.window, Camera.instance)
+	def _draw(self, surface, camera: Camera):
+		""" Draws the frame (no display update).
+		:param surface: the render backend, or a FrameRecorder in pipelined mode.
+		"""
+		#surface.fill(config.WHITE)
+		surface.blit(self.background, (0,0))
+		self.lvl.draw(surface, camera)
+		self.player.draw(surface, Camera.instance)
 
 		# User Interface
 		if self.player.dead:
-			self.window.blit(self.gameover_txt,self.gameover_rect)# gameover txt
-			self.window.blit(self.restart_txt, self.restart_rect)
-		self.window.blit(self.score_txt, self.score_pos)# score txt
+			surface.blit(self.gameover_txt,self.gameover_rect)# gameover txt
+			surface.blit(self.restart_txt, self.restart_rect)
+		surface.blit(self.score_txt, self.score_pos)# score txt
 
-		pygame.display.update()# window update
+	def _present(self, applied: list = None):
+		""" Shows the drawn frame and waits for the next one.
+		:param applied list: input edges applied in this frame (pipelined loop, see LatencyTracker.take_applied()).
+		"""
+		if self.latency:
+			self._present_measured(applied)
+			return
+		self.window.present()# window update
 		self.clock.tick(config.FPS)# max loop/s
 
+	def _render_loop(self, camera: Camera):
+		# ----------- Display -----------
+		self._draw(self.window, camera)
+		self._present()
+
+	def _present_measured(self, applied: list = None):
+		" Like _present(), timing display update and clock.tick."
+		start = perf_counter()
+		self.window.present()
+		presented = perf_counter()
+		self.latency.display.add((presented-start)*1000)
+		self.latency.presented(applied)
+		self.clock.tick(config.FPS)
+		self.latency.tick.add((perf_counter()-presented)*1000)
+
 
 	def run(self):
 		# ============= MAIN GAME LOOP =============
+		if config.PIPELINED:
+			Pipeline(self).run()# returns once the game is closed
 		while self.__alive:
+			if self.player.dead:
+				self._idle_loop()
+				continue
 			self._event_loop() 
-			self._update_loop()
+			self._update_frame()
 			self._render_loop(self.camera)
+		if self.spectator:
+			self.spectator.stop()
+		if self.snapshot_writer:
+			self.snapshot_writer.close()
+		if self.latency:
+			log.info("latency.report", self.latency.report())
 		pygame.quit()
 
 if __name__ == "__main__":
 	# ============= PROGRAM STARTS HERE =============
+	profile = profiles.select()
+	if profile:
+		profiles.apply(profile)
 	game = Game()
 	game.run()
\ No newline at end of file
@@ -0,0 +1,124 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from queue import Queue, SimpleQueue, Empty, Full
+import threading
+import pygame
+
+import settings as config
+
+if TYPE_CHECKING:
+	from main import Game
+
+
+class FrameRecorder:
+	"""
+	A class to represent a frame being recorded.
+
+	Used in place of the render backend (same blit() method) by the
+	simulation thread: blits are stored instead of drawn.
+	"""
+	def __init__(self):
+		self.__blits = []
+
+	def blit(self, image:pygame.Surface, dest) -> None:
+		self.__blits.append((image, int(dest[0]), int(dest[1])))
+
+	def snapshot(self) -> tuple:
+		""" Returns the recorded frame: a tuple of (surface, x, y) in camera space.
+		Surfaces are shared, never modified images (see assets.load_image).
+		"""
+		return tuple(self.__blits)
+
+
+def replay(snapshot:tuple, surface) -> None:
+	""" Draws a recorded frame.
+	:param snapshot tuple: a FrameRecorder.snapshot().
+	:param surface: the render backend to draw on.
+	"""
+	for image, x, y in snapshot:
+		surface.blit(image, (x, y))
+
+
+class Pipeline:
+	"""
+	A class to represent the pipelined game loop.
+
+	The simulation thread handles events, updates the game and records
+	frame N+1 while the main thread draws and presents frame N
+	(pygame releases the GIL during blits and display updates).
+	The frame queue holds at most PIPELINE_DEPTH frames: the simulation
+	waits when the render is behind (back-pressure).
+	Events are still read on the main thread (SDL requirement) and forwarded.
+	"""
+	def __init__(self, game:Game, depth:int=config.PIPELINE_DEPTH):
+		self.game = game
+		self.frames = Queue(maxsize=depth)
+		self.events = SimpleQueue()
+		self.frame_count = 0
+		self.idle = False# game over frame sent, simulation waiting for events
+
+	def _send(self, frame:tuple) -> None:
+		" Queues a frame, waiting while the queue is full."
+		while self.game.alive:
+			try:
+				self.frames.put(frame, timeout=.1)
+				return
+			except Full:
+				pass
+
+	def _simulate(self, frames:int) -> None:
+		" Simulation thread."
+		game = self.game
+		button_down = None# GPIO button state while the game over screen is shown
+		while game.alive:
+			if game.player.dead:
+				# game over: the last frame was sent, sleep until an event
+				if button_down is None:
+					button_down = game.player.gpio_pressed()
+				try:
+					game._handle_event(self.events.get(timeout=config.IDLE_TIMEOUT/1000))
+				except Empty:
+					# timed out: poll the button in case GPIO edge events are unavailable
+					if game.player.gpio_pressed() and not button_down:
+						game.reset()
+					button_down = game.player.gpio_pressed()
+				self.idle = game.player.dead
+				continue
+			button_down = None
+			while not self.events.empty():
+				game._handle_event(self.events.get())
+			game._update_frame()
+
+			recorder = FrameRecorder()
+			game._draw(recorder, game.camera)
+			# input edges applied in this frame are presented with it
+			applied = game.latency.take_applied() if game.latency else None
+			self._send((recorder.snapshot(), applied))
+			self.idle = game.player.dead
+			self.frame_count += 1
+			if frames and self.frame_count >= frames:
+				game.close()
+
+	def run(self, frames:int=None) -> None:
+		""" Runs the game until it is closed (main thread: events and render).
+		:param frames int: close the game after this many frames (benchmarks).
+		"""
+		game = self.game
+		simulation = threading.Thread(target=self._simulate, args=(frames,),
+			name="simulation", daemon=True)
+		simulation.start()
+		while game.alive or not self.frames.empty():
+			if self.idle and self.frames.empty():
+				# game over screen shown: sleep until an event
+				event = pygame.event.wait(config.IDLE_TIMEOUT)
+				if event.type != pygame.NOEVENT:
+					self.events.put(event)
+			for event in pygame.event.get():
+				self.events.put(event)
+			try:
+				snapshot, applied = self.frames.get(timeout=.1)
+			except Empty:
+				continue
+			replay(snapshot, game.window)
+			game._present(applied)
+		simulation.join()
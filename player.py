@@ -2,7 +2,7 @@ from math import copysign
 import pygame
 from pygame.math import Vector2
 from pygame.locals import KEYDOWN, K_SPACE
-from pygame.sprite import collide_rect
+from pygame import Rect
 from pygame.event import Event
 from camera import Camera
 from singleton import Singleton
@@ -10,9 +10,14 @@ from sprite import Sprite
 from level import Level
 from bullet import Bullet
 from enemy import Enemy
+from assets import load_image
+from collision import swept_collide, opaque_rect, swept_mask_collide
 import settings as config
+import log
 import smbus
 import time
+from scheduler import Scheduler
+from latency import SimulatedGyro
 import RPi.GPIO as GPIO
 
 # Return the sign of a number: getsign(-5) -> -1
@@ -24,6 +29,15 @@ BUTTON_GPIO_PIN = 17  # GPIO pin number for the button; adjust as needed
 GPIO.setmode(GPIO.BCM)  # Use Broadcom pin-numbering scheme
 GPIO.setup(BUTTON_GPIO_PIN, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
 
+# Pygame event posted (from the GPIO thread) when the button is pressed,
+# wakes up the game while it is waiting on pygame.event.wait()
+BUTTON_EVENT = pygame.event.custom_type()
+try:
+    GPIO.add_event_detect(BUTTON_GPIO_PIN, GPIO.RISING, bouncetime=50,
+        callback=lambda channel: pygame.event.post(Event(BUTTON_EVENT)))
+except RuntimeError as e:
+    log.warning("gpio.watch_failed", "Could not watch the GPIO button", error=str(e))
+
 class Player(Sprite, Singleton):
     def __init__(self, *args):
         # calling default Sprite constructor
@@ -33,17 +47,18 @@ class Player(Sprite, Singleton):
         self.gyro_sensor = None
         self.init_gyro_sensor()
         
+        # Times are in ms on the game clock (Scheduler.instance.now)
         self.last_fire_time = 0  # Track the time of the last bullet fired
-        self.fire_cooldown = 0.3
+        self.fire_cooldown = 300
         self.button_pressed = False
         self.last_button_press_time = 0
-        self.button_press_delay = 0.2  # Delay in seconds between button presses
+        self.button_press_delay = 200  # Delay between button presses
         
         # Rest of your initialization code remains the same
-        self._image_right = pygame.image.load("./images/penguin-right.png").convert_alpha()
-        self._image_right = pygame.transform.scale(self._image_right, (60, 60))
-        self._image_left = pygame.image.load("./images/penguin-left.png").convert_alpha()
-        self._image_left = pygame.transform.scale(self._image_left, (60, 60))
+        self._image_right = load_image("./images/penguin-right.png", (60, 60))
+        self._image_left = load_image("./images/penguin-left.png", (60, 60))
+        self._image_shoot = load_image("./images/penguin-shoot.png", (40, 60))
+        self._image_dead = load_image("./images/tombstone.png", (60, 60))
         self._image = self._image_right  # Start facing right
 
         self.bullets = pygame.sprite.Group()
@@ -63,10 +78,18 @@ class Player(Sprite, Singleton):
         self.dead = False
         self.gyro_movement_modifier = 0.5 
 
+        self.latency = None  # LatencyTracker, set by Game when enabled
+        self._button_high = False  # GPIO button state on last update
+
     def init_gyro_sensor(self, retries=3):
         """
         Initialize the MPU6050 sensor with retry mechanism
         """
+        if config.SIMULATED_GYRO:
+            self.gyro_sensor = SimulatedGyro()
+            self.gyro_threshold = 10
+            log.info("gyro.simulated", "Using simulated gyro sensor")
+            return True
         try:
             from mpu6050 import mpu6050
             for attempt in range(retries):
@@ -75,7 +98,7 @@ class Player(Sprite, Singleton):
                     # Verify the connection with a test read
                     test_data = self.gyro_sensor.get_temp()
                     self.gyro_threshold = 10  # Sensitivity threshold to detect tilt
-                    print(f"Gyro sensor initialized successfully on attempt {attempt + 1}")
+                    log.info("gyro.init", "Gyro sensor initialized", attempt=attempt + 1)
                     
                     # Configure the sensor with appropriate settings
                     # You might need to adjust these values based on your needs
@@ -83,14 +106,13 @@ class Player(Sprite, Singleton):
                     self.gyro_sensor.set_accel_range(self.gyro_sensor.ACCEL_RANGE_2G)
                     return True
                 except Exception as e:
-                    print(f"Attempt {attempt + 1} failed: {e}")
+                    log.warning("gyro.init_attempt_failed", "Gyro sensor initialization failed", attempt=attempt + 1, error=str(e))
                     time.sleep(0.5)  # Wait before retry
                     
             raise Exception("Failed to initialize after all attempts")
                     
         except Exception as e:
-            print(f"Warning: Could not initialize gyro sensor: {e}")
-            print("Falling back to keyboard controls")
+            log.warning("gyro.init_failed", "Could not initialize gyro sensor, falling back to keyboard controls", error=str(e))
             self.gyro_sensor = None
             return False
 
@@ -113,10 +135,13 @@ class Player(Sprite, Singleton):
                 self._image = self._image_right
             else:
                 self._input = 0
+            if self.latency:
+                self.latency.sample("keyboard", self._input)
             return
 
         try:
             # Read gyro data for x-axis rotation
+            read_start = time.perf_counter()
             gyro_data = self.gyro_sensor.get_gyro_data()
             tilt_x = gyro_data['y']
             
@@ -130,12 +155,14 @@ class Player(Sprite, Singleton):
             else:
                 # When gyro is stable (not tilted), stop movement
                 self._input = 0
+            if self.latency:
+                self.latency.sample("gyro", self._input, read_start)
 
         except Exception as e:
-            print(f"Warning: Could not read gyro data: {e}")
+            log.warning("gyro.read_failed", "Could not read gyro data", error=str(e))
             # Try to reinitialize the sensor if there's an I2C error
             if "I2C" in str(e):
-                print("Attempting to reinitialize sensor...")
+                log.info("gyro.reinit", "Attempting to reinitialize sensor")
                 self.init_gyro_sensor()
             self._input = 0
 
@@ -149,8 +176,7 @@ class Player(Sprite, Singleton):
         new_bullet = Bullet(bullet_x, bullet_y, config.BULLET_SPEED, is_player_bullet=True)
         new_bullet.set_position(bullet_x, bullet_y)
         self.bullets.add(new_bullet)
-        self._image = pygame.image.load("./images/penguin-shoot.png").convert_alpha()
-        self._image = pygame.transform.scale(self._image, (40, 60))
+        self._image = self._image_shoot
 
     def _fix_velocity(self):
         """ Set player's velocity between max/min.
@@ -161,6 +187,10 @@ class Player(Sprite, Singleton):
         self._velocity.x = min(self._velocity.x, self.__maxvelocity.x)
         self._velocity.x = round(max(self._velocity.x, -self.__maxvelocity.x), 2)
 
+    @property
+    def velocity(self) -> Vector2:
+        return self._velocity
+
     def reset(self):
         " Called only when game restarts (after player death)."
         self._velocity = Vector2()
@@ -170,12 +200,20 @@ class Player(Sprite, Singleton):
         self.bullets.empty()
         self._image = self._image_right
 
+    def gpio_pressed(self) -> bool:
+        """ Is the GPIO button currently down ? """
+        return GPIO.input(BUTTON_GPIO_PIN) == GPIO.HIGH
+
     def handle_event(self, event: pygame.event.Event):
-        current_time = time.time()
+        current_time = Scheduler.instance.now
         if event.type == KEYDOWN and event.key == K_SPACE:
+            if self.latency:
+                self.latency.edge("space")
             self.button_pressed = True
             self.last_button_press_time = current_time
         elif event.type == pygame.KEYUP and event.key == K_SPACE:
+            if self.latency:
+                self.latency.drop("space")
             self.button_pressed = False
 
     def jump(self, force=None):
@@ -184,28 +222,54 @@ class Player(Sprite, Singleton):
         self._velocity.y = -force
 
     def onCollide(self, obj: Sprite):
-        self.rect.bottom = obj.rect.top
+        # stand the drawn penguin on the drawn platform/bonus
+        self.rect.y += opaque_rect(obj).top - opaque_rect(self).bottom
         self.jump()
 
-    def collisions(self):
+    def _hit_time(self, start: Rect, fall: float, obj: Sprite):
+        """ Time of contact in [0,1] with obj's drawn image during this frame's fall, None if none.
+        The whole fall is tested, so obj can't be skipped: a rect test on the opaque bounding rects first,
+        then the swept rect test (time of contact), then the pixel test along the fall.
+        """
+        opaque, obj_opaque = opaque_rect(self), opaque_rect(obj)
+        # sweep vertically only (x may have wrapped around the screen)
+        opaque_start = opaque.move(0, start.y - self.rect.y)
+        if not opaque.union(opaque_start).colliderect(obj_opaque):
+            return None
+        t = swept_collide(opaque_start, opaque, obj_opaque)
+        if t is None or not swept_mask_collide(self, fall, obj):
+            return None
+        return t
+
+    def collisions(self, start: Rect):
         """ Checks for collisions with level.
         Should be called in Player.update().
+        :param start pygame.Rect: the player rect before this frame's move.
         """
         lvl = Level.instance
         if not lvl:
             return
+        # check falling and colliding <=> isGrounded ?
+        if self._velocity.y <= .5:
+            return
+        fall = self.rect.y - start.y
+        hit = None  # (time, obj, platform) of the first contact
         for platform in lvl.platforms:
-            # check falling and colliding <=> isGrounded ?
-            if self._velocity.y > .5:
-                # check collisions with platform's spring bonus
-                if platform.bonus and collide_rect(self, platform.bonus):
-                    self.onCollide(platform.bonus)
-                    self.jump(platform.bonus.force)
-
-                # check collisions with platform
-                if collide_rect(self, platform):
-                    self.onCollide(platform)
-                    platform.onCollide()
+            # check collisions with platform's spring bonus, then platform
+            for obj in (platform.bonus, platform):
+                if not obj:
+                    continue
+                t = self._hit_time(start, fall, obj)
+                if t is not None and (not hit or t < hit[0]):
+                    hit = (t, obj, platform)
+        if not hit:
+            return
+        _, obj, platform = hit
+        self.onCollide(obj)
+        if obj is platform:
+            platform.onCollide()
+        else:
+            self.jump(obj.force)
 
     def update(self, camera: Camera):
         # Update player input based on gyro data or keyboard
@@ -222,11 +286,21 @@ class Player(Sprite, Singleton):
             self._velocity.y = 0
             return
             
-        current_time = time.time()
-        if (self.button_pressed or GPIO.input(BUTTON_GPIO_PIN) == GPIO.HIGH) and (current_time - self.last_button_press_time) >= self.button_press_delay and (current_time - self.last_fire_time) >= self.fire_cooldown:
+        current_time = Scheduler.instance.now
+        button_high = self.gpio_pressed()
+        if self.latency and button_high != self._button_high:
+            if button_high:
+                self.latency.edge("gpio")
+            else:
+                self.latency.drop("gpio")
+        self._button_high = button_high
+        if (self.button_pressed or button_high) and (current_time - self.last_button_press_time) >= self.button_press_delay and (current_time - self.last_fire_time) >= self.fire_cooldown:
             self.fire_bullet()
             self.last_fire_time = current_time
             self.last_button_press_time = current_time
+            if self.latency:
+                self.latency.applied("space")
+                self.latency.applied("gpio")
 
         # Velocity update (apply gravity, input acceleration)
         self._velocity.y += self.gravity
@@ -243,24 +317,36 @@ class Player(Sprite, Singleton):
             self._velocity.x = round(self._velocity.x)
         self._fix_velocity()
 
-        # Check for collisions with enemy bullets
+        # Position Update (prevent x-axis to be out of screen)
+        start = self.rect.copy()
+        self.rect.x = (self.rect.x + self._velocity.x) % (config.XWIN - self.rect.width)
+        self.rect.y += self._velocity.y
+        if self.latency:
+            self._track_movement(self.rect.x != start.x)
+
+        # Check for collisions with enemy bullets (along this frame's move)
         for enemy in Enemy.instances:
             for bullet in enemy.bullets:
-                if pygame.sprite.collide_rect(self, bullet):
-                    self._image = pygame.image.load("./images/tombstone.png").convert_alpha()
-                    self._image = pygame.transform.scale(self._image, (60, 60))
+                if bullet.hits(self, self.rect.y - start.y):
+                    self._image = self._image_dead
                     bullet.kill()
                     self.dead = True
                     return
 
-        # Position Update (prevent x-axis to be out of screen)
-        self.rect.x = (self.rect.x + self._velocity.x) % (config.XWIN - self.rect.width)
-        self.rect.y += self._velocity.y
-
-        self.collisions()
+        self.collisions(start)
         for bullet in self.bullets:
             bullet.update(camera)
 
+    def _track_movement(self, moved: bool):
+        """ Reports a pending input edge as applied once the player moves accordingly:
+        in the new direction, or not at all when the input was released.
+        """
+        source = "gyro" if self.gyro_sensor else "keyboard"
+        if not self.latency.pending(source):
+            return
+        if (moved and getsign(self._velocity.x) == self._input) or (not moved and not self._input):
+            self.latency.applied(source)
+
     def draw(self, surface: pygame.Surface, camera: Camera):
         # Draw player with camera transformation
         surface.blit(self._image, camera.apply(self))
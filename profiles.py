@@ -0,0 +1,151 @@
+"""
+Device performance profiles.
+
+A profile overrides settings (render backend and internal resolution,
+frame rate, entity counts, pipelined loop) and is applied before the
+game is created. With PROFILE = "auto", a short render benchmark picks
+the richest profile the device sustains on its first start; the choice
+is cached in PROFILE_CACHE with the device it was measured on, so the
+benchmark runs again when the SD card moves to another Pi model.
+"""
+import json
+import os
+import platform
+from time import perf_counter
+import pygame
+
+import settings as config
+import log
+from assets import load_image, solid, level_images
+from render import create_renderer
+
+# Richest first: calibration picks the first one the device sustains.
+# FPS below UPDATE_RATE keeps the game speed (several updates per frame).
+PROFILES = {
+	"high": {
+		"RENDER_BACKEND": "texture", "RENDER_SIZE": config.DISPLAY, "FPS": 60,
+		"PIPELINED": True, "MAX_PLATFORM_NUMBER": 10, "MAX_ENEMIES": 10,
+	},
+	"medium": {
+		"RENDER_BACKEND": "surface", "RENDER_SIZE": config.DISPLAY, "FPS": 60,
+		"PIPELINED": True, "MAX_PLATFORM_NUMBER": 10, "MAX_ENEMIES": 4,
+	},
+	"low": {
+		"RENDER_BACKEND": "surface", "RENDER_SIZE": (config.XWIN*3//4, config.YWIN*3//4), "FPS": 60,
+		"PIPELINED": False, "MAX_PLATFORM_NUMBER": 10, "MAX_ENEMIES": 3,
+	},
+	"minimal": {
+		"RENDER_BACKEND": "surface", "RENDER_SIZE": (config.XWIN//2, config.YWIN//2), "FPS": 30,
+		"PIPELINED": False, "MAX_PLATFORM_NUMBER": 10, "MAX_ENEMIES": 2,
+	},
+}
+
+HEADROOM = .6# share of the frame time the render may use (the rest: updates, input, OS)
+DURATION = .5# seconds measured per profile
+
+
+def apply(name:str) -> None:
+	""" Overrides settings with a profile (before the game is created).
+	:param name str: a PROFILES key.
+	"""
+	for setting, value in PROFILES[name].items():
+		setattr(config, setting, value)
+
+
+def device() -> str:
+	" Identifies the hardware (the Pi model when known) the calibration ran on."
+	try:
+		with open("/proc/device-tree/model") as file:
+			model = file.read().strip("\0\n")
+	except OSError:
+		model = platform.node()
+	return f"{model} {platform.machine()} {os.cpu_count()} cpu"
+
+
+def measure(name:str, duration:float=DURATION) -> float:
+	""" Renders a busy synthetic frame with a profile's settings.
+	:param name str: a PROFILES key.
+	:param duration float: seconds to render for.
+	:return float: average frame time in ms.
+	"""
+	saved = {setting: getattr(config, setting) for setting in PROFILES[name]}
+	apply(name)
+	try:
+		window = create_renderer()
+		images = level_images()
+		window.preload(*images)
+		background, penguin, _, platform_image, _, walrus, fish = images
+		bullet = solid((5, 15), config.BULLET_COLOR)
+
+		# every entity the profile allows, spread over the screen
+		frame = [(background, (0, 0)), (penguin, (config.HALF_XWIN, config.HALF_YWIN))]
+		step = config.YWIN//config.MAX_PLATFORM_NUMBER
+		for i in range(config.MAX_PLATFORM_NUMBER):
+			x, y = (i*157) % (config.XWIN-120), i*step
+			frame.append((platform_image, (x, y)))
+			if i < config.MAX_ENEMIES:
+				frame += [(walrus, (x, y-40)), (bullet, (x+30, y+40)), (bullet, (x+30, y+120))]
+			else:
+				frame.append((fish, (x, y-30)))
+
+		frames, start = 0, perf_counter()
+		while frames < 3 or perf_counter()-start < duration:
+			for image, pos in frame:
+				window.blit(image, pos)
+			window.present()
+			frames += 1
+		return (perf_counter()-start)*1000/frames
+	finally:
+		for setting, value in saved.items():
+			setattr(config, setting, value)
+		# images are converted for this backend's display (or not at all)
+		load_image.cache_clear()
+		solid.cache_clear()
+
+
+def calibrate() -> str:
+	""" Returns the richest profile rendering within its frame budget.
+	Pipelined profiles need a second core.
+	"""
+	chosen = None
+	for name, profile in PROFILES.items():
+		if profile["PIPELINED"] and (os.cpu_count() or 1) < 2:
+			continue
+		try:
+			frame_time = measure(name)
+		except (pygame.error, RuntimeError) as e:# e.g. no SDL2 renderer
+			log.warning("profile.unsupported", "Profile not supported", profile=name, error=str(e))
+			continue
+		budget = 1000/profile["FPS"]
+		log.info("profile.measured", "Calibration", profile=name, frame_ms=round(frame_time, 2), budget_ms=round(budget, 2))
+		if frame_time <= budget*HEADROOM:
+			chosen = name
+			break
+	# drop the benchmark windows
+	pygame.display.quit()
+	pygame.display.init()
+	return chosen or list(PROFILES)[-1]
+
+
+def select() -> str:
+	""" Returns the profile to run with (config.PROFILE), None to keep the settings.
+	"auto" reuses the profile cached for this device, or calibrates and caches one.
+	"""
+	if config.PROFILE != "auto":
+		return config.PROFILE
+	path = config.PROFILE_CACHE
+	try:
+		with open(path) as file:
+			cached = json.load(file)
+		if cached["device"] == device() and cached["profile"] in PROFILES:
+			return cached["profile"]
+	except (OSError, ValueError, KeyError):
+		pass
+	name = calibrate()
+	try:
+		with open(path, "w") as file:
+			json.dump({"profile": name, "device": device()}, file)
+	except OSError as e:
+		log.warning("profile.cache_failed", "Could not cache the profile", path=path, error=str(e))
+	log.info("profile.calibrated", "Profile selected", profile=name, device=device())
+	return name
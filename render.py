@@ -0,0 +1,135 @@
+from weakref import WeakKeyDictionary
+import pygame
+from pygame import Rect, Surface
+
+import settings as config
+
+
+class SurfaceRenderer:
+	"""
+	A class to represent the software render backend.
+
+	Blits surfaces onto the display surface (the original render path).
+	When RENDER_SIZE differs from the game resolution, everything is drawn
+	at the internal resolution and the frame is scaled to the window.
+	"""
+	def __init__(self, size:tuple, render_size:tuple, window_size:tuple, flags:int=0):
+		self.window = pygame.display.set_mode(window_size, flags)
+		self.scale = None
+		if tuple(render_size) != tuple(window_size) or tuple(size) != tuple(window_size):
+			self.scale = (render_size[0]/size[0], render_size[1]/size[1])
+			self.target = Surface(render_size).convert()
+			# images scaled to the internal resolution, dropped with their source
+			self._scaled = WeakKeyDictionary()
+
+	def _get_scaled(self, image:Surface) -> Surface:
+		scaled = self._scaled.get(image)
+		if scaled is None:
+			w, h = image.get_size()
+			scaled = pygame.transform.scale(image,
+				(max(1, round(w*self.scale[0])), max(1, round(h*self.scale[1]))))
+			self._scaled[image] = scaled
+		return scaled
+
+	def preload(self, *images:Surface) -> None:
+		" Prepares images ahead of the first frame."
+		if self.scale:
+			for image in images:
+				self._get_scaled(image)
+
+	def blit(self, image:Surface, dest) -> None:
+		""" Draws image at dest (game coordinates), like Surface.blit().
+		:param image pygame.Surface: the image to draw.
+		:param dest: the top left position (or rect) to draw at.
+		"""
+		if not self.scale:
+			self.window.blit(image, dest)
+			return
+		self.target.blit(self._get_scaled(image),
+			(int(dest[0]*self.scale[0]), int(dest[1]*self.scale[1])))
+
+	def present(self) -> None:
+		" Shows the frame drawn since the last call."
+		if self.scale:
+			pygame.transform.scale(self.target, self.window.get_size(), self.window)
+		pygame.display.update()
+
+
+class TextureRenderer:
+	"""
+	A class to represent the SDL2 texture render backend.
+
+	Images are uploaded once as textures and drawn by the GPU renderer,
+	falling back to SDL's software renderer when no accelerated one exists.
+	The frame is drawn at RENDER_SIZE into a target texture that is
+	then stretched to the window.
+	"""
+	def __init__(self, size:tuple, render_size:tuple, window_size:tuple, flags:int=0):
+		from pygame._sdl2.video import Window, Renderer, Texture
+		self._Texture = Texture
+
+		self.window = Window("PenguinJump", size=window_size,
+			fullscreen=bool(flags & pygame.FULLSCREEN))
+		try:
+			self.renderer = Renderer(self.window, accelerated=1)
+		except RuntimeError:# pygame._sdl2 error: no accelerated driver
+			self.renderer = Renderer(self.window, accelerated=0)
+
+		self.target = None
+		if tuple(render_size) != tuple(window_size):
+			self.target = Texture(self.renderer, render_size, target=True)
+			self.scale = (render_size[0]/size[0], render_size[1]/size[1])
+		else:
+			self.scale = (window_size[0]/size[0], window_size[1]/size[1])
+		self._textures = WeakKeyDictionary()
+		self._begin()
+
+	def _begin(self) -> None:
+		" Prepares the render target for a new frame."
+		if self.target:
+			self.renderer.target = self.target
+		self.renderer.scale = self.scale
+		self.renderer.clear()
+
+	def texture(self, image:Surface):
+		""" Returns the texture of given image, uploading it on first use.
+		:param image pygame.Surface: a surface that is not modified afterwards.
+		"""
+		texture = self._textures.get(image)
+		if texture is None:
+			texture = self._Texture.from_surface(self.renderer, image)
+			self._textures[image] = texture
+		return texture
+
+	def preload(self, *images:Surface) -> None:
+		" Uploads images ahead of the first frame."
+		for image in images:
+			self.texture(image)
+
+	def blit(self, image:Surface, dest) -> None:
+		""" Draws image at dest (game coordinates), like Surface.blit().
+		:param image pygame.Surface: the image to draw.
+		:param dest: the top left position (or rect) to draw at.
+		"""
+		self.texture(image).draw(dstrect=Rect((dest[0], dest[1]), image.get_size()))
+
+	def present(self) -> None:
+		" Shows the frame drawn since the last call."
+		if self.target:
+			self.renderer.target = None
+			self.target.draw()
+		self.renderer.present()
+		self._begin()
+
+
+BACKENDS = {
+	"surface": SurfaceRenderer,
+	"texture": TextureRenderer,
+}
+
+def create_renderer(backend:str=None):
+	""" Creates the render backend selected in settings.
+	:param backend str: "surface" or "texture" (defaults to config.RENDER_BACKEND).
+	"""
+	return BACKENDS[backend or config.RENDER_BACKEND](
+		config.DISPLAY, config.RENDER_SIZE, config.WINDOW_SIZE, config.FLAGS)
@@ -0,0 +1,98 @@
+import heapq
+from itertools import count
+
+from singleton import Singleton
+import settings as config
+
+
+class Timer:
+	"""
+	A class to represent a scheduled callback.
+
+	Returned by Scheduler.call_later() / Scheduler.call_every().
+	"""
+	__slots__ = ("when", "interval", "callback", "cancelled")
+
+	def __init__(self, when:float, interval:float, callback):
+		self.when = when
+		self.interval = interval
+		self.callback = callback
+		self.cancelled = False
+
+	def cancel(self) -> None:
+		" Stops the timer (safe to call more than once)."
+		self.cancelled = True
+
+
+class Scheduler(Singleton):
+	"""
+	A class to represent the game clock and its timers.
+
+	Time (in milliseconds) only advances on tick(), once per game update:
+	it stops when the simulation stops and is the same in headless runs.
+	Timers are kept in a heap, a tick only runs the ones that are due.
+	Can be access via Singleton: Scheduler.instance.
+	(Check Singleton design pattern for more info)
+	"""
+
+	# constructor called on new instance: Scheduler()
+	def __init__(self):
+		self.now = 0
+		self.__queue = []
+		self.__order = count()# keeps timers due at the same time in order
+
+	def __push(self, timer:Timer) -> Timer:
+		heapq.heappush(self.__queue, (timer.when, next(self.__order), timer))
+		return timer
+
+	def call_at(self, when:float, callback, interval:float=0) -> Timer:
+		""" Calls callback at given game time, then every interval ms if set.
+		:param when float: game time of the first call (ms).
+		:param callback: function called without arguments.
+		:param interval float: time between calls in ms, 0 to call once.
+		"""
+		return self.__push(Timer(when, interval, callback))
+
+	def call_later(self, delay:float, callback) -> Timer:
+		""" Calls callback once, delay ms from now.
+		:param delay float: time to wait in ms (game time).
+		:param callback: function called without arguments.
+		"""
+		return self.call_at(self.now+delay, callback)
+
+	def call_every(self, interval:float, callback, delay:float=None) -> Timer:
+		""" Calls callback every interval ms until the timer is cancelled.
+		:param interval float: time between calls in ms (game time).
+		:param callback: function called without arguments.
+		:param delay float: time before the first call (defaults to interval).
+		"""
+		if delay is None:
+			delay = interval
+		return self.call_at(self.now+delay, callback, interval)
+
+	def set_time(self, now:float) -> None:
+		""" Moves the clock to now (snapshot restore).
+		Pending timers keep the time they had left.
+		"""
+		shift = now-self.now
+		for _, _, timer in self.__queue:
+			timer.when += shift
+		# same shift for all: still a valid heap
+		self.__queue = [(timer.when, order, timer) for _, order, timer in self.__queue]
+		self.now = now
+
+	def tick(self, dt:float=config.TIMESTEP) -> None:
+		""" Advances the clock and runs due timers.
+		Should be called each game update.
+		:param dt float: game time elapsed in ms.
+		"""
+		self.now += dt
+		queue = self.__queue
+		while queue and queue[0][0] <= self.now:
+			_, _, timer = heapq.heappop(queue)
+			if timer.cancelled:
+				continue
+			if timer.interval:
+				timer.when += timer.interval
+				self.__push(timer)
+			timer.callback()
@@ -9,6 +9,41 @@ HALF_XWIN,HALF_YWIN = XWIN/2,YWIN/2 # Center
 DISPLAY = (XWIN,YWIN)
 FLAGS = 0 #                           Fullscreen, resizeable... 
 FPS = 60 #                            Render frame rate
+UPDATE_RATE = 60 #                    Game updates per second (game speed), several per frame when FPS is lower
+TIMESTEP = 1000/UPDATE_RATE #         Game time (ms) advanced by each update
+IDLE_TIMEOUT = 500 #                  Game over screen: max ms between wake-ups
+PIPELINED = False #                   Update next frame on a thread while this one renders
+PIPELINE_DEPTH = 1 #                  Frames the simulation may run ahead of the render
+
+# Render
+RENDER_BACKEND = "surface" #          "surface" (software blits) or "texture" (SDL2 renderer)
+WINDOW_SIZE = DISPLAY #               Window size, the game is scaled to fit
+RENDER_SIZE = DISPLAY #               Internal resolution, e.g. (300,400) on low-end devices
+
+# Performance profiles (see profiles.py)
+PROFILE = "auto" #                    A profile name, "auto" (calibrated on first start) or None (these settings)
+PROFILE_CACHE = "profile.json" #      Calibrated profile of this device
+
+# Spectator stream (attract-mode displays)
+SPECTATOR_ENABLED = False
+SPECTATOR_ADDRESS = ("127.0.0.1",5757) # Local only
+SPECTATOR_KEYFRAME_INTERVAL = 60 #     Full state every n frames
+
+# Input latency instrumentation
+LATENCY_TRACKING = False #            Print input-to-photon latency histograms on exit
+SIMULATED_GYRO = False #              Test mode: replace the MPU6050 by a simulated sensor
+SIMULATED_GYRO_PERIOD = .5 #          Seconds per simulated tilt phase
+SIMULATED_GYRO_READ_DELAY = .002 #    Simulated I2C read time (s)
+
+# Snapshots (instant resume after a power loss)
+SNAPSHOT_FILE = None #                e.g. "resume.bin": saved periodically, restored on start
+SNAPSHOT_INTERVAL = 5000 #            Game time (ms) between saves
+
+# Logging
+LOG_LEVEL = "INFO" #                  DEBUG, INFO, WARNING or ERROR
+LOG_RATE_PERIOD = 10 #                Seconds, rate limit window per message key
+LOG_RATE_BURST = 3 #                  Records written per key and window
+LOG_QUEUE_SIZE = 1000 #               Records waiting for the writer thread (more are dropped)
 
 # Colors
 BLACK = (0,0,0)
@@ -41,6 +76,9 @@ BONUS_SPAWN_CHANCE = 15
 BREAKABLE_PLATFORM_CHANCE = 9
 SLIDEABLE_PLATFORM_CHANCE = 15
 ENEMY_SPAWN_CHANCE = 15
+MAX_ENEMIES = MAX_PLATFORM_NUMBER
+ACTIVE_MARGIN = 100 #                 Pixels above/below the view where enemies stay awake
+ACTIVITY_LOG_INTERVAL = 1000 #        Game time (ms) between enemy activity logs (DEBUG level)
 
 # Fonts
 LARGE_FONT = SysFont("",128)
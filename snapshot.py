@@ -0,0 +1,229 @@
+"""
+Full game state snapshot / restore.
+
+The state is packed with struct in a compact binary blob:
+camera, player and its bullets, every platform with its bonus, enemy
+and enemy bullets, and the random generator state.
+Singletons (Camera, Level, Player...) are restored in place.
+The game clock is restored too (other pending timers keep the time they
+had left), so a restored game replays exactly like the original.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import os
+import random
+import struct
+import threading
+
+from scheduler import Scheduler
+from level import Platform
+from enemy import Enemy
+from bullet import Bullet
+import log
+
+if TYPE_CHECKING:
+	from main import Game
+
+MAGIC = b"PJSS"
+VERSION = 2
+
+_HEADER = struct.Struct("<4sB")
+_CLOCK = struct.Struct("<d")#           game time
+_CAMERA = struct.Struct("<ii")#          state y, maxheight
+_PLAYER = struct.Struct("<iiddBBbdd")#   x, y, vx, vy, flags, image, input, last fire, last press
+_COUNT = struct.Struct("<H")
+_BULLET = struct.Struct("<iiiB")#        x, y, speed, is player bullet
+_PLATFORM = struct.Struct("<iiiiBbb")#   x, y, w, h, flags, direction, speed
+_BONUS = struct.Struct("<ii")#           x, y
+_ENEMY = struct.Struct("<iidB")#         x, y, next shot time, asleep
+_RANDOM = struct.Struct("<B625I?d")#     version, Mersenne Twister state, gauss_next
+
+# Player flags
+DEAD, BUTTON_PRESSED, BUTTON_HIGH = 1, 2, 4
+# Platform flags
+BASE, BREAKABLE, SLIDEABLE, BONUS, ENEMY, REMOVING = 1, 2, 4, 8, 16, 32
+
+
+def _player_images(player) -> tuple:
+	return (player._image_right, player._image_left, player._image_shoot, player._image_dead)
+
+
+def _pack_bullets(parts:list, bullets) -> None:
+	parts.append(_COUNT.pack(len(bullets)))
+	parts.extend(_BULLET.pack(b.rect.x, b.rect.y, b.speed, b.is_player_bullet) for b in bullets)
+
+
+def save(game:Game) -> bytes:
+	""" Packs the complete game state.
+	:param game Game: the game to save.
+	:return bytes: the snapshot blob.
+	"""
+	camera, player, lvl = game.camera, game.player, game.lvl
+	parts = [_HEADER.pack(MAGIC, VERSION), _CLOCK.pack(Scheduler.instance.now),
+		_CAMERA.pack(camera.state.y, camera.maxheight)]
+
+	flags = (DEAD if player.dead else 0) | (BUTTON_PRESSED if player.button_pressed else 0) \
+		| (BUTTON_HIGH if player._button_high else 0)
+	parts.append(_PLAYER.pack(player.rect.x, player.rect.y, player.velocity.x, player.velocity.y,
+		flags, _player_images(player).index(player._image), player._input,
+		player.last_fire_time, player.last_button_press_time))
+	_pack_bullets(parts, player.bullets)
+
+	parts.append(_COUNT.pack(len(lvl.platforms)))
+	for platform in lvl.platforms:
+		bonus, enemy = platform.bonus, platform.enemy
+		if enemy not in Enemy.instances:# killed: stays on its platform, but not in the game
+			enemy = None
+		flags = (BASE if platform is lvl.base_platform else 0) \
+			| (BREAKABLE if platform.breakable else 0) | (SLIDEABLE if platform.slideable else 0) \
+			| (BONUS if bonus else 0) | (ENEMY if enemy else 0) \
+			| (REMOVING if platform in lvl.pending_removal else 0)
+		parts.append(_PLATFORM.pack(*platform.rect, flags, platform.direction, platform.speed))
+		if bonus:
+			parts.append(_BONUS.pack(*bonus.rect.topleft))
+		if enemy:
+			parts.append(_ENEMY.pack(*enemy.rect.topleft, enemy.shoot_timer.when, enemy.asleep))
+			_pack_bullets(parts, enemy.bullets)
+
+	version, mt, gauss = random.getstate()
+	parts.append(_RANDOM.pack(version, *mt, gauss is not None, gauss or 0))
+	return b"".join(parts)
+
+
+class _Reader:
+	" Sequential struct reader over a snapshot blob."
+	def __init__(self, data:bytes):
+		self.data = data
+		self.offset = 0
+
+	def read(self, fmt:struct.Struct) -> tuple:
+		values = fmt.unpack_from(self.data, self.offset)
+		self.offset += fmt.size
+		return values
+
+	def bullets(self) -> list:
+		count, = self.read(_COUNT)
+		return [Bullet(x, y, speed, is_player_bullet=bool(is_player))
+			for x, y, speed, is_player in (self.read(_BULLET) for _ in range(count))]
+
+
+def restore(game:Game, data:bytes) -> None:
+	""" Restores a state packed by save().
+	:param game Game: the game to restore into.
+	:param data bytes: the snapshot blob.
+	"""
+	reader = _Reader(data)
+	magic, version = reader.read(_HEADER)
+	if magic != MAGIC or version != VERSION:
+		raise ValueError("Not a valid game snapshot !")
+	scheduler = Scheduler.instance
+	scheduler.set_time(*reader.read(_CLOCK))
+	camera, player, lvl = game.camera, game.player, game.lvl
+
+	camera.state.y, camera.maxheight = reader.read(_CAMERA)
+
+	x, y, vx, vy, flags, image, player._input, player.last_fire_time, player.last_button_press_time \
+		= reader.read(_PLAYER)
+	player.rect.topleft = (x, y)
+	player.velocity.update(vx, vy)
+	player.dead = bool(flags & DEAD)
+	player.button_pressed = bool(flags & BUTTON_PRESSED)
+	player._button_high = bool(flags & BUTTON_HIGH)
+	player._image = _player_images(player)[image]
+	player.bullets.empty()
+	player.bullets.add(*reader.bullets())
+
+	# drop current enemies (and their timers), new ones come with their platforms
+	for enemy in list(Enemy.instances):
+		enemy.reset()
+	platforms, removing = [], []
+	count, = reader.read(_COUNT)
+	for _ in range(count):
+		x, y, w, h, flags, direction, speed = reader.read(_PLATFORM)
+		if flags & BASE:
+			platform = lvl.base_platform
+			platform.rect.topleft = (x, y)
+		else:
+			platform = Platform(x, y, w, h, initial_bonus=bool(flags & BONUS),
+				breakable=bool(flags & BREAKABLE), slideable=bool(flags & SLIDEABLE),
+				has_enemy=bool(flags & ENEMY))
+		platform.direction, platform.speed = direction, speed
+		if flags & BONUS:
+			platform.bonus.rect.topleft = reader.read(_BONUS)
+		if flags & ENEMY:
+			enemy = platform.enemy
+			x, y, next_shot, asleep = reader.read(_ENEMY)
+			enemy.rect.topleft = (x, y)
+			enemy.shoot_timer.cancel()
+			enemy.asleep = bool(asleep)
+			if not enemy.asleep:
+				enemy.shoot_timer = scheduler.call_at(next_shot, enemy.shoot, Enemy.SHOOT_INTERVAL)
+			enemy.bullets.add(*reader.bullets())
+		platforms.append(platform)
+		if flags & REMOVING:
+			removing.append(platform)
+	lvl.restore(platforms, removing)
+
+	# last: creating platforms above draws random numbers
+	version, *mt, has_gauss, gauss = reader.read(_RANDOM)
+	random.setstate((version, tuple(mt), gauss if has_gauss else None))
+
+
+def write_file(path:str, data:bytes) -> None:
+	" Writes a snapshot blob to path atomically (a power loss leaves the previous file)."
+	tmp = path+".tmp"
+	with open(tmp, "wb") as file:
+		file.write(data)
+		file.flush()
+		os.fsync(file.fileno())
+	os.replace(tmp, path)
+
+
+def save_file(game:Game, path:str) -> None:
+	" Saves a snapshot to path atomically (blocking: see SnapshotWriter on the game thread)."
+	write_file(path, save(game))
+
+
+class SnapshotWriter:
+	"""
+	A class to represent the background snapshot file writer.
+
+	The game thread only packs the snapshot (well under a millisecond),
+	the write, fsync and replace (slow on SD cards) run on a daemon thread.
+	When the writer is behind, only the latest snapshot is kept.
+	"""
+	def __init__(self, path:str):
+		self.path = path
+		self.__data = None# latest snapshot waiting to be written
+		self.__closed = False
+		self.__condition = threading.Condition()
+		self.__thread = threading.Thread(target=self.__run, name="snapshot", daemon=True)
+		self.__thread.start()
+
+	def write(self, data:bytes) -> None:
+		""" Queues a snapshot blob to be written to path (returns immediately).
+		:param data bytes: a blob returned by save().
+		"""
+		with self.__condition:
+			self.__data = data
+			self.__condition.notify()
+
+	def close(self) -> None:
+		" Writes the pending snapshot, then stops the thread."
+		with self.__condition:
+			self.__closed = True
+			self.__condition.notify()
+		self.__thread.join()
+
+	def __run(self) -> None:
+		while True:
+			with self.__condition:
+				while self.__data is None and not self.__closed:
+					self.__condition.wait()
+				data, self.__data = self.__data, None
+			if data is None:# closed, nothing left to write
+				return
+			try:
+				write_file(self.path, data)
+			except OSError as e:
+				log.warning("snapshot.write_failed", "Could not save the snapshot", path=self.path, error=str(e))
@@ -0,0 +1,278 @@
+"""
+Local spectator stream of the game state.
+
+Wire format (little endian), every message is prefixed by its length (uint32):
+	header   : type (0=keyframe, 1=delta) uint8, frame uint32, flags uint8
+	player   : x int32, y int32, vx float32, vy float32   (if flags & PLAYER)
+	camera   : y int32                                    (if flags & CAMERA)
+	counts   : updated uint16, removed uint16
+	updated  : uid uint32, kind uint8, x int32, y int32   (x updated)
+	removed  : uid uint32                                 (x removed)
+A keyframe carries every visible entity: viewers drop their state first.
+Deltas only carry what changed since the previous message.
+"""
+import asyncio
+import struct
+import threading
+
+import settings as config
+
+# Entity kinds
+PLATFORM, BREAKABLE, BONUS, ENEMY, PLAYER_BULLET, ENEMY_BULLET = range(6)
+
+# Message types and header flags
+KEYFRAME, DELTA = 0, 1
+PLAYER, CAMERA = 1, 2
+
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<BIB")
+_PLAYER = struct.Struct("<iiff")
+_CAMERA = struct.Struct("<i")
+_COUNTS = struct.Struct("<HH")
+_ENTITY = struct.Struct("<IBii")
+_UID = struct.Struct("<I")
+
+# stop writing to a viewer that has this many bytes waiting (it gets a keyframe once drained)
+MAX_BUFFERED = 64*1024
+
+
+def capture(player, camera, level, enemies) -> tuple:
+	""" Captures the visible game state as plain immutable values.
+	Called on the game thread, once per frame.
+	:return tuple: (player, camera_y, entities) with entities as {uid: (kind, x, y)}.
+	"""
+	view = camera.state
+	entities = {}
+	for platform in level.platforms:
+		if view.colliderect(platform.rect):
+			entities[platform.uid] = (BREAKABLE if platform.breakable else PLATFORM,
+				platform.rect.x, platform.rect.y)
+			if platform.bonus:
+				entities[platform.bonus.uid] = (BONUS, platform.bonus.rect.x, platform.bonus.rect.y)
+	for enemy in enemies:
+		if view.colliderect(enemy.rect):
+			entities[enemy.uid] = (ENEMY, enemy.rect.x, enemy.rect.y)
+		for bullet in enemy.bullets:
+			if view.colliderect(bullet.rect):
+				entities[bullet.uid] = (ENEMY_BULLET, bullet.rect.x, bullet.rect.y)
+	for bullet in player.bullets:
+		if view.colliderect(bullet.rect):
+			entities[bullet.uid] = (PLAYER_BULLET, bullet.rect.x, bullet.rect.y)
+	velocity = player.velocity
+	return ((player.rect.x, player.rect.y, velocity.x, velocity.y), view.y, entities)
+
+
+class StateEncoder:
+	"""
+	A class to represent the stream encoder.
+
+	Encodes each state as a delta against the previously encoded one,
+	with a keyframe every keyframe_interval messages.
+	"""
+	def __init__(self, keyframe_interval:int=config.SPECTATOR_KEYFRAME_INTERVAL):
+		self.keyframe_interval = keyframe_interval
+		self.frame = 0
+		self._player = None
+		self._camera = None
+		self._entities = {}
+
+	def _pack(self, kind:int, player:tuple, camera:int, updated:dict, removed:list) -> bytes:
+		flags = (PLAYER if player else 0) | (CAMERA if camera is not None else 0)
+		parts = [_HEADER.pack(kind, self.frame, flags)]
+		if player:
+			parts.append(_PLAYER.pack(*player))
+		if camera is not None:
+			parts.append(_CAMERA.pack(camera))
+		parts.append(_COUNTS.pack(len(updated), len(removed)))
+		parts.extend(_ENTITY.pack(uid, *entity) for uid, entity in updated.items())
+		parts.extend(_UID.pack(uid) for uid in removed)
+		payload = b"".join(parts)
+		return _LENGTH.pack(len(payload)) + payload
+
+	def keyframe(self) -> bytes:
+		" Encodes the last encoded state in full (sent to new viewers)."
+		return self._pack(KEYFRAME, self._player, self._camera, self._entities, [])
+
+	def encode(self, state:tuple) -> tuple:
+		""" Encodes a captured state.
+		:param state tuple: a state returned by capture().
+		:return tuple: (message bytes, is_keyframe)
+		"""
+		player, camera, entities = state
+		previous, previous_player, previous_camera = self._entities, self._player, self._camera
+		self.frame += 1
+		self._player, self._camera, self._entities = player, camera, entities
+		if self.frame % self.keyframe_interval == 0:
+			return self.keyframe(), True
+
+		updated = {uid: entity for uid, entity in entities.items() if previous.get(uid) != entity}
+		removed = [uid for uid in previous if uid not in entities]
+		return self._pack(DELTA,
+			player if player != previous_player else None,
+			camera if camera != previous_camera else None,
+			updated, removed), False
+
+
+class StateDecoder:
+	"""
+	A class to represent a viewer side decoder.
+
+	Feed it the received bytes, it keeps the current state up to date:
+	player (x, y, vx, vy), camera_y and entities {uid: (kind, x, y)}.
+	"""
+	def __init__(self):
+		self._buffer = b""
+		self.synced = False# True once a keyframe was received
+		self.frame = 0
+		self.player = None
+		self.camera_y = 0
+		self.entities = {}
+
+	def feed(self, data:bytes) -> int:
+		""" Decodes every complete message in data.
+		:return int: number of messages applied.
+		"""
+		self._buffer += data
+		applied = 0
+		while len(self._buffer) >= _LENGTH.size:
+			length, = _LENGTH.unpack_from(self._buffer)
+			end = _LENGTH.size + length
+			if len(self._buffer) < end:
+				break
+			self._apply(memoryview(self._buffer)[_LENGTH.size:end])
+			self._buffer = self._buffer[end:]
+			applied += 1
+		return applied
+
+	def _apply(self, payload) -> None:
+		kind, frame, flags = _HEADER.unpack_from(payload)
+		if kind == KEYFRAME:
+			self.entities = {}
+			self.synced = True
+		offset = _HEADER.size
+		if flags & PLAYER:
+			self.player = _PLAYER.unpack_from(payload, offset)
+			offset += _PLAYER.size
+		if flags & CAMERA:
+			self.camera_y, = _CAMERA.unpack_from(payload, offset)
+			offset += _CAMERA.size
+		nb_updated, nb_removed = _COUNTS.unpack_from(payload, offset)
+		offset += _COUNTS.size
+		for uid, *entity in _ENTITY.iter_unpack(payload[offset:offset+nb_updated*_ENTITY.size]):
+			self.entities[uid] = tuple(entity)
+		offset += nb_updated*_ENTITY.size
+		for uid, in _UID.iter_unpack(payload[offset:offset+nb_removed*_UID.size]):
+			self.entities.pop(uid, None)
+		self.frame = frame
+
+
+class SpectatorServer:
+	"""
+	A class to represent the spectator stream server.
+
+	An asyncio server running on its own thread.
+	publish() is called by the game thread and only hands the captured
+	state over: encoding and socket writes happen on the server thread.
+	"""
+	def __init__(self, address:tuple=config.SPECTATOR_ADDRESS,
+			keyframe_interval:int=config.SPECTATOR_KEYFRAME_INTERVAL):
+		self.address = address
+		self.encoder = StateEncoder(keyframe_interval)
+		self._clients = {}# writer -> needs a keyframe
+		self._pending = None
+		self._pending_lock = threading.Lock()# _pending is swapped by both threads
+		self._loop = None
+		self._ready = threading.Event()
+		self._thread = threading.Thread(target=self._run, name="spectator", daemon=True)
+
+	def start(self) -> None:
+		" Starts the server thread (returns once listening)."
+		self._thread.start()
+		self._ready.wait()
+
+	def stop(self) -> None:
+		if self._loop:
+			self._loop.call_soon_threadsafe(self._loop.stop)
+
+	def _run(self) -> None:
+		self._loop = asyncio.new_event_loop()
+		asyncio.set_event_loop(self._loop)
+		self._loop.run_until_complete(asyncio.start_server(self._on_client, *self.address))
+		self._ready.set()
+		self._loop.run_forever()
+
+	async def _on_client(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+		self._clients[writer] = True
+		try:
+			# viewers never send anything: wait for disconnection
+			while await reader.read(1024):
+				pass
+		except ConnectionError:
+			pass
+		finally:
+			self._clients.pop(writer, None)
+			writer.close()
+
+	def publish(self, state:tuple) -> None:
+		""" Sends a state captured this frame to every viewer (called from the game thread).
+		If the server thread is behind, intermediate states are skipped.
+		:param state tuple: a state returned by capture().
+		"""
+		if not self._clients:
+			return
+		with self._pending_lock:
+			schedule = self._pending is None
+			self._pending = state
+		if schedule:
+			self._loop.call_soon_threadsafe(self._broadcast)
+
+	def _broadcast(self) -> None:
+		with self._pending_lock:
+			state, self._pending = self._pending, None
+		message, is_keyframe = self.encoder.encode(state)
+		keyframe = message if is_keyframe else None
+		for writer, needs_keyframe in list(self._clients.items()):
+			if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+				self._clients[writer] = True# slow viewer: skip frames, resync later
+				continue
+			if needs_keyframe:
+				keyframe = keyframe or self.encoder.keyframe()
+				writer.write(keyframe)
+				self._clients[writer] = False
+			else:
+				writer.write(message)
+
+
+if __name__ == "__main__":
+	# ============= Minimal viewer: python spectator.py =============
+	import socket
+	import pygame
+
+	COLORS = {PLATFORM:config.ICE, BREAKABLE:config.LIGHT_ICE, BONUS:config.WHITE,
+		ENEMY:config.GRAY, PLAYER_BULLET:config.ICE, ENEMY_BULLET:config.BLACK}
+	SIZES = {PLATFORM:config.PLATFORM_SIZE, BREAKABLE:config.PLATFORM_SIZE, BONUS:(30,15),
+		ENEMY:(50,15), PLAYER_BULLET:(5,15), ENEMY_BULLET:(5,15)}
+
+	window = pygame.display.set_mode(config.DISPLAY)
+	clock = pygame.time.Clock()
+	stream = socket.create_connection(config.SPECTATOR_ADDRESS)
+	stream.setblocking(False)
+	decoder = StateDecoder()
+	while not pygame.event.peek(pygame.QUIT):
+		pygame.event.pump()
+		try:
+			data = stream.recv(65536)
+			if not data:
+				break
+			decoder.feed(data)
+		except BlockingIOError:
+			pass
+		window.fill(config.LIGHT_GREEN)
+		for kind, x, y in decoder.entities.values():
+			pygame.draw.rect(window, COLORS[kind], (x, y-decoder.camera_y, *SIZES[kind]))
+		if decoder.player:
+			x, y = decoder.player[:2]
+			pygame.draw.rect(window, config.PLAYER_COLOR, (x, y-decoder.camera_y, *config.PLAYER_SIZE))
+		pygame.display.update()
+		clock.tick(config.FPS)
+	pygame.quit()
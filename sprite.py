@@ -1,6 +1,8 @@
+from itertools import count
 import pygame
 from pygame import Surface, Rect
 from camera import Camera
+from assets import convert
 
 class Sprite(pygame.sprite.Sprite):  # Inherit from pygame.sprite.Sprite
     """
@@ -8,13 +10,17 @@ class Sprite(pygame.sprite.Sprite):  # Inherit from pygame.sprite.Sprite
 
     Used for pygame displaying.
     Image generated with given color and size.
+    Each sprite gets a unique id (uid) for the lifetime of the program.
     """
+    _uids = count(1)
+
     def __init__(self, x: int, y: int, w: int, h: int, color: tuple):
         super().__init__()  # Initialize pygame.sprite.Sprite
+        self.uid = next(Sprite._uids)
         self.__color = color
         self._image = Surface((w, h))
         self._image.fill(self.color)
-        self._image = self._image.convert()
+        self._image = convert(self._image, False)
         self.rect = Rect(x, y, w, h)
         self.camera_rect = self.rect.copy()
 